@@ -194,9 +194,8 @@ class SupervisorConfiguration(BaseModel):
         _log.info(f"Starting supervisord: {self.config_path}")
         if not self.running():
             if daemon is False:
-                Popen(f"supervisord -n -c {self.config_path!s}", shell=True)
-                return
-            Popen(f"supervisord -c {self.config_path!s}", close_fds=True, shell=True)
+                return Popen(f"supervisord -n -c {self.config_path!s}", shell=True)
+            return Popen(f"supervisord -c {self.config_path!s}", close_fds=True, shell=True)
 
     def running(self):
         # grab the pidfile, find the process with the pid, and kill
@@ -394,7 +394,7 @@ def _add_to_typer(app, command: SupervisorTaskStep, foo):
     app.command(command)(foo)
 
 
-def main():
+def _build_app() -> Typer:
     app = Typer()
     _add_to_typer(app, "configure-supervisor", write_supervisor_config)
     _add_to_typer(app, "start-supervisor", start_supervisor)
@@ -405,4 +405,9 @@ def main():
     _add_to_typer(app, "stop-supervisor", stop_supervisor)
     _add_to_typer(app, "force-kill", kill_supervisor)
     _add_to_typer(app, "unconfigure-supervisor", remove_supervisor_config)
+    return app
+
+
+def main():
+    app = _build_app()
     app()
@@ -0,0 +1,28 @@
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def supervisord_available() -> bool:
+    """Check if supervisord binary is available.
+
+    Set SUPERVISOR_PYDANTIC_STRICT_PROBE=1 to also run `supervisord --version`
+    and detect a broken install.
+    """
+    path = shutil.which("supervisord")
+    if not path or not os.access(path, os.X_OK):
+        return False
+    if os.environ.get("SUPERVISOR_PYDANTIC_STRICT_PROBE") != "1":
+        return True
+    try:
+        result = subprocess.run(
+            [path, "--version"],
+            capture_output=True,
+            check=False,
+            timeout=5,
+        )
+        return result.returncode == 0
+    except (subprocess.TimeoutExpired, OSError):
+        return False
@@ -1,14 +1,14 @@
-import shutil
-import subprocess
 from subprocess import check_call
-from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
 import pytest
+from _env import supervisord_available
 from typer import Exit
+from typer.testing import CliRunner
 
 from supervisor_pydantic import ProgramConfiguration, SupervisorConvenienceConfiguration
 from supervisor_pydantic.convenience.commands import (
+    _build_app,
     _check_exists,
     _check_running,
     _check_same,
@@ -20,39 +20,48 @@ from supervisor_pydantic.convenience.commands import (
     write_supervisor_config,
 )
 
+SUPERVISORD = supervisord_available()
 
-def _supervisord_available() -> bool:
-    """Check if supervisord binary is available and functional."""
-    if not shutil.which("supervisord"):
-        return False
-    try:
-        result = subprocess.run(
-            ["supervisord", "--version"],
-            capture_output=True,
-            check=False,
-            timeout=5,
+
+@pytest.fixture
+def make_cfg(tmp_path):
+    def _make(**overrides):
+        return SupervisorConvenienceConfiguration(
+            port="*:9001",
+            working_dir=str(tmp_path),
+            program={"test": ProgramConfiguration(command="echo hello")},
+            **overrides,
         )
-        return result.returncode == 0
-    except (subprocess.TimeoutExpired, OSError, FileNotFoundError):
-        return False
+
+    return _make
+
+
+@pytest.fixture(scope="module")
+def supervisor_json(supervisor_convenience_configuration: SupervisorConvenienceConfiguration) -> str:
+    return supervisor_convenience_configuration.model_dump_json(exclude_unset=True)
 
 
 def test_command():
+    result = CliRunner().invoke(_build_app(), ["--help"])
+    assert result.exit_code == 0
+    assert "configure-supervisor" in result.output
+
+
+@pytest.mark.slow
+def test_command_entrypoint():
     assert check_call(["_supervisor_convenience", "--help"]) == 0
 
 
-def test_write(supervisor_convenience_configuration: SupervisorConvenienceConfiguration):
-    json = supervisor_convenience_configuration.model_dump_json(exclude_unset=True)
-    assert write_supervisor_config(json, _exit=False)
-    assert supervisor_convenience_configuration._pydantic_path.read_text().strip() == json
+def test_write(supervisor_convenience_configuration: SupervisorConvenienceConfiguration, supervisor_json: str):
+    assert write_supervisor_config(supervisor_json, _exit=False)
+    assert supervisor_convenience_configuration._pydantic_path.read_text().strip() == supervisor_json
     supervisor_convenience_configuration.rmdir()
 
 
-@pytest.mark.skipif(not _supervisord_available(), reason="supervisord is not installed or not functional")
-def test_start_stop(supervisor_convenience_configuration: SupervisorConvenienceConfiguration):
-    json = supervisor_convenience_configuration.model_dump_json(exclude_unset=True)
-    assert write_supervisor_config(json, _exit=False)
-    assert supervisor_convenience_configuration._pydantic_path.read_text().strip() == json
+@pytest.mark.skipif(not SUPERVISORD, reason="supervisord is not installed")
+def test_start_stop(supervisor_convenience_configuration: SupervisorConvenienceConfiguration, supervisor_json: str):
+    assert write_supervisor_config(supervisor_json, _exit=False)
+    assert supervisor_convenience_configuration._pydantic_path.read_text().strip() == supervisor_json
     assert start_supervisor(supervisor_convenience_configuration._pydantic_path, _exit=False)
     assert stop_supervisor(supervisor_convenience_configuration._pydantic_path, _exit=False)
     supervisor_convenience_configuration.rmdir()
@@ -96,35 +105,28 @@ def test_wait_or_while_timeout():
         call_count += 1
         return False
 
-    result = _wait_or_while(until=always_false, timeout=2)
+    with patch("supervisor_pydantic.convenience.commands.sleep") as sleep:
+        result = _wait_or_while(until=always_false, timeout=2)
     assert result is False
     assert call_count == 2  # Called once per second
+    assert sleep.call_count == 2
+    sleep.assert_called_with(1)
 
 
-def test_load_or_pass_with_string():
+def test_load_or_pass_with_string(make_cfg):
     """Test _load_or_pass with a JSON string."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        json_str = cfg.model_dump_json()
-        result = _load_or_pass(json_str)
-        assert isinstance(result, SupervisorConvenienceConfiguration)
-        assert result.port == "*:9001"
+    cfg = make_cfg()
+    json_str = cfg.model_dump_json()
+    result = _load_or_pass(json_str)
+    assert isinstance(result, SupervisorConvenienceConfiguration)
+    assert result.port == "*:9001"
 
 
-def test_load_or_pass_with_config_object():
+def test_load_or_pass_with_config_object(make_cfg):
     """Test _load_or_pass passes through a config object."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        result = _load_or_pass(cfg)
-        assert result is cfg
+    cfg = make_cfg()
+    result = _load_or_pass(cfg)
+    assert result is cfg
 
 
 def test_load_or_pass_with_invalid_type():
@@ -133,133 +135,88 @@ def test_load_or_pass_with_invalid_type():
         _load_or_pass(12345)  # type: ignore
 
 
-def test_check_exists_true():
+def test_check_exists_true(make_cfg):
     """Test _check_exists returns True when both paths exist."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        cfg._write_self()
-        assert _check_exists(cfg) is True
+    cfg = make_cfg()
+    cfg._write_self()
+    assert _check_exists(cfg) is True
 
 
-def test_check_exists_false():
+def test_check_exists_false(make_cfg):
     """Test _check_exists returns False when paths don't exist."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        # Don't write the config
-        assert _check_exists(cfg) is False
+    cfg = make_cfg()
+    # Don't write the config
+    assert _check_exists(cfg) is False
 
 
-def test_check_same_no_file():
+def test_check_same_no_file(make_cfg):
     """Test _check_same returns True when no file exists."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        # Don't write - should return True (can write it)
-        assert _check_same(cfg) is True
+    cfg = make_cfg()
+    # Don't write - should return True (can write it)
+    assert _check_same(cfg) is True
 
 
-def test_check_same_matching_file():
+def test_check_same_matching_file(make_cfg):
     """Test _check_same returns True when file matches."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        cfg._write_self()
-        assert _check_same(cfg) is True
+    cfg = make_cfg()
+    cfg._write_self()
+    assert _check_same(cfg) is True
 
 
-def test_check_same_different_file():
+def test_check_same_different_file(make_cfg):
     """Test _check_same returns False when file differs."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        cfg._write_self()
-        # Modify the config file directly to simulate a different config
-        cfg.config_path.write_text("different content")
-        assert _check_same(cfg) is False
+    cfg = make_cfg()
+    cfg._write_self()
+    # Modify the config file directly to simulate a different config
+    cfg.config_path.write_text("different content")
+    assert _check_same(cfg) is False
 
 
-def test_check_running_not_running():
+def test_check_running_not_running(make_cfg):
     """Test _check_running returns False when supervisor is not running."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        cfg._write_self()
-        # Not started, so not running
-        assert _check_running(cfg) is False
+    cfg = make_cfg()
+    cfg._write_self()
+    # Not started, so not running
+    assert _check_running(cfg) is False
 
 
-def test_check_running_with_mock():
+def test_check_running_with_mock(make_cfg):
     """Test _check_running returns True when supervisor is running."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        cfg._write_self()
+    cfg = make_cfg()
+    cfg._write_self()
 
-        with patch(
-            "supervisor_pydantic.convenience.commands.SupervisorConvenienceConfiguration.running",
-            return_value=True,
-        ):
-            assert _check_running(cfg) is True
+    with patch(
+        "supervisor_pydantic.convenience.commands.SupervisorConvenienceConfiguration.running",
+        return_value=True,
+    ):
+        assert _check_running(cfg) is True
 
 
-def test_load_or_pass_with_path():
+def test_load_or_pass_with_path(make_cfg):
     """Test _load_or_pass with a Path object."""
 
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        # Write the pydantic JSON config file
-        cfg._write_self()
-        json_path = cfg._pydantic_path
+    cfg = make_cfg()
+    # Write the pydantic JSON config file
+    cfg._write_self()
+    json_path = cfg._pydantic_path
 
-        result = _load_or_pass(json_path)
-        assert isinstance(result, SupervisorConvenienceConfiguration)
+    result = _load_or_pass(json_path)
+    assert isinstance(result, SupervisorConvenienceConfiguration)
 
 
-def test_write_supervisor_config_different_file():
+def test_write_supervisor_config_different_file(make_cfg):
     """Test write_supervisor_config when file already exists with different content."""
-    with TemporaryDirectory() as td:
-        cfg = SupervisorConvenienceConfiguration(
-            port="*:9001",
-            working_dir=td,
-            program={"test": ProgramConfiguration(command="echo hello")},
-        )
-        # Write a different config first
-        cfg._write_self()
-        cfg.config_path.write_text("different content")
-
-        # Now write the correct config
-        json = cfg.model_dump_json()
-        result = write_supervisor_config(json, _exit=False)
-        assert result is True
-        # The config should now match
-        assert _check_same(cfg) is True
+    cfg = make_cfg()
+    # Write a different config first
+    cfg._write_self()
+    cfg.config_path.write_text("different content")
+
+    # Now write the correct config
+    json = cfg.model_dump_json()
+    result = write_supervisor_config(json, _exit=False)
+    assert result is True
+    # The config should now match
+    assert _check_same(cfg) is True
 
 
 def test_main_creates_app():
@@ -1,5 +1,61 @@
+import errno
+import selectors
+import socket
+from collections.abc import Callable
+from time import monotonic, sleep
+
 from supervisor_pydantic.utils import _get_calling_file
 
+# Loopback refusals come back immediately, so pace retries after a failed connect
+_RETRY_INTERVAL = 0.05
+
+
+def _probe_socket() -> socket.socket:
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.setblocking(False)
+    return s
+
+
+def _wait_for_server_ready(port: int, timeout: float = 10, running: Callable[[], bool] | None = None) -> bool:
+    """Wait until the server is accepting connections on the given port and, if given, `running()` is true."""
+    deadline = monotonic() + timeout
+    connected = False
+    s = _probe_socket()
+    try:
+        with selectors.DefaultSelector() as sel:
+            while (remaining := deadline - monotonic()) > 0:
+                if not connected:
+                    err = s.connect_ex(("127.0.0.1", port))
+                    if err in (errno.EINPROGRESS, errno.EALREADY):
+                        # Connecting socket becomes writable once the connect resolves either way,
+                        # keep waiting on the same socket while the connect is still pending
+                        sel.register(s, selectors.EVENT_WRITE)
+                        events = sel.select(timeout=min(remaining, 0.25))
+                        sel.unregister(s)
+                        if not events:
+                            continue
+                        err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    connected = err in (0, errno.EISCONN)
+                    if not connected:
+                        # Connect failed, a socket in this state cannot portably be reused
+                        s.close()
+                        s = _probe_socket()
+                if connected and (running is None or running()):
+                    return True
+                sleep(min(remaining, _RETRY_INTERVAL))
+            return False
+    finally:
+        s.close()
+
+
+def _alloc_ephemeral_port() -> int:
+    """Ask the OS for a free ephemeral port."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind(("", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
 
 def get_calling_file(offset=2):
     return _get_calling_file(offset)
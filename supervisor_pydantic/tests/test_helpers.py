@@ -0,0 +1,34 @@
+import socket
+from threading import Timer
+from unittest.mock import patch
+
+import helpers
+from helpers import _RETRY_INTERVAL, _alloc_ephemeral_port, _wait_for_server_ready
+
+
+def test_wait_for_server_ready_paces_refused_connects():
+    """Test _wait_for_server_ready does not spin on a port nothing is listening on."""
+    port = _alloc_ephemeral_port()
+    with patch.object(helpers, "_probe_socket", wraps=helpers._probe_socket) as probe_socket:
+        assert _wait_for_server_ready(port, timeout=0.5) is False
+    # One socket per refused attempt, paced by the retry interval
+    assert probe_socket.call_count <= 0.5 / _RETRY_INTERVAL + 2
+
+
+def test_wait_for_server_ready_reuses_pending_socket():
+    """Test _wait_for_server_ready keeps one socket while its connect is pending."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(0)
+        port = listener.getsockname()[1]
+        # Fill the accept queue so the probe's connect stays pending until a slot frees up
+        filler = socket.create_connection(("127.0.0.1", port))
+        timer = Timer(0.5, lambda: listener.accept()[0].close())
+        timer.start()
+        try:
+            with patch.object(helpers, "_probe_socket", wraps=helpers._probe_socket) as probe_socket:
+                assert _wait_for_server_ready(port, timeout=5) is True
+        finally:
+            timer.join()
+            filler.close()
+    assert probe_socket.call_count == 1